@@ -0,0 +1,32 @@
+"""Add row versions
+
+Revision ID: 5c1f0e7a9b2d
+Revises: 407d6d392c91
+Create Date: 2026-10-19 10:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1f0e7a9b2d'
+down_revision: Union[str, Sequence[str], None] = '407d6d392c91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('blogs', sa.Column('version_id', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('users', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('users', sa.Column('version_id', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'version_id')
+    op.drop_column('users', 'updated_at')
+    op.drop_column('blogs', 'version_id')
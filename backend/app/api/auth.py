@@ -8,20 +8,12 @@ from app.core.security import (
     create_access_token,
     decode_access_token,
 )
-from app.db.session import SessionLocal
+from app.db.session import get_db, mark_recent_write
 from app.db.models.user import User
 
 router = APIRouter()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @router.post("/signup", response_model=UserRead)
 def signup(user: UserCreate, db: Session = Depends(get_db)):
     if db.query(User).filter(User.email == user.email).first():
@@ -32,6 +24,8 @@ def signup(user: UserCreate, db: Session = Depends(get_db)):
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
+    # No cookie yet, so the after_commit hook cannot tell who wrote
+    mark_recent_write(new_user.id)
     return new_user
 
 
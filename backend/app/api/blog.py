@@ -1,25 +1,34 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.db.session import SessionLocal
+from app.db.session import get_db, get_read_db
 from app.db.models.blog import Blog
+from app.db.models.user import User
 from app.schemas.blog import BlogRead
+from app.core.caching import (
+    PRIVATE_CACHE,
+    cache_headers,
+    is_not_modified,
+    latest,
+    make_etag,
+    not_modified,
+    read_cache_control,
+)
+from app.core.feeds import feed_store
 from app.core.security import decode_access_token
+from app.core.serialization import (
+    BLOG_FIELDS,
+    USER_FIELDS,
+    json_response,
+    serialize_blog_rows,
+    user_label,
+)
 from app.config.cloudinary import upload_image  # assumes you configured cloudinary here
 import random
 
 router = APIRouter()
 
 
-# Dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 def get_unique_blog_id(db: Session) -> int:
     while True:
         blog_id = random.randint(10**7, 10**8 - 1)
@@ -42,6 +51,44 @@ def get_blog_or_404(blog_id: int, db: Session) -> Blog:
     return blog
 
 
+def get_blog_versions(db: Session, *criteria) -> list:
+    # Validator columns only, so 304 decisions never load `content`
+    rows = (
+        db.query(
+            Blog.id,
+            Blog.version_id,
+            Blog.created_at,
+            Blog.updated_at,
+            User.id,
+            User.version_id,
+            User.updated_at,
+        )
+        .join(Blog.user)
+        .filter(*criteria)
+        .order_by(Blog.id.desc())
+        .all()
+    )
+    return [tuple(row) for row in rows]
+
+
+def get_blog_rows(db: Session, *criteria) -> list:
+    # Plain column rows for serialize_blog_rows, skipping ORM hydration
+    return (
+        db.query(
+            *(getattr(Blog, field) for field in BLOG_FIELDS),
+            *(getattr(User, field).label(user_label(field)) for field in USER_FIELDS),
+        )
+        .join(Blog.user)
+        .filter(*criteria)
+        .order_by(Blog.id.desc())
+        .all()
+    )
+
+
+def blog_last_modified(versions: list):
+    return latest(*(ts for row in versions for ts in (row[2], row[3], row[6])))
+
+
 def verify_blog_ownership(blog: Blog, user_id: int):
     if blog.user_id != user_id:
         raise HTTPException(
@@ -50,7 +97,7 @@ def verify_blog_ownership(blog: Blog, user_id: int):
 
 
 @router.post("/create", response_model=BlogRead)
-async def create_blog(
+def create_blog(
     title: str = Form(...),
     content: str = Form(...),
     excerpt: str = Form(...),
@@ -85,11 +132,12 @@ async def create_blog(
     db.add(new_blog)
     db.commit()
     db.refresh(new_blog)
+    feed_store.blog_saved(new_blog)
     return new_blog
 
 
 @router.put("/update/{blog_id}", response_model=BlogRead)
-async def update_blog(
+def update_blog(
     blog_id: int,
     title: Optional[str] = Form(None),
     content: Optional[str] = Form(None),
@@ -124,35 +172,61 @@ async def update_blog(
                 status_code=500, detail=f"Image upload failed: {str(e)}"
             )
 
+    # Incremented in SQL so overlapping updates stay last-write-wins
+    blog.version_id = Blog.version_id + 1
     db.commit()
     db.refresh(blog)
+    feed_store.blog_saved(blog)
     return blog
 
 
 @router.get("/all", response_model=List[BlogRead])
-def get_all_blogs(db: Session = Depends(get_db)):
-    blogs = db.query(Blog).order_by(Blog.id.desc()).all()
-    return blogs
+def get_all_blogs(request: Request, db: Session = Depends(get_read_db)):
+    # No Last-Modified on lists: a deletion would not move it forward
+    headers = cache_headers(
+        make_etag(get_blog_versions(db)), cache_control=read_cache_control(request)
+    )
+    if is_not_modified(request, headers["ETag"]):
+        return not_modified(headers)
+
+    return json_response(serialize_blog_rows(get_blog_rows(db)), headers)
 
 
 @router.get("/get/{blog_id}", response_model=BlogRead)
 def get_blog_by_id(
     blog_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
 ):
-    blog = get_blog_or_404(blog_id, db)
-    return blog
+    versions = get_blog_versions(db, Blog.id == blog_id)
+    if not versions:
+        raise HTTPException(status_code=404, detail="Blog not found")
+    last_modified = blog_last_modified(versions)
+    headers = cache_headers(
+        make_etag(versions), last_modified, read_cache_control(request)
+    )
+    if is_not_modified(request, headers["ETag"], last_modified):
+        return not_modified(headers)
+
+    rows = get_blog_rows(db, Blog.id == blog_id)
+    if not rows:
+        raise HTTPException(status_code=404, detail="Blog not found")
+    return json_response(serialize_blog_rows(rows)[0], headers)
 
 
 @router.get("/my-blogs", response_model=List[BlogRead])
 def get_user_blogs(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     user_id: int = Depends(get_current_user_id),
 ):
-    blogs = (
-        db.query(Blog).filter(Blog.user_id == user_id).order_by(Blog.id.desc()).all()
-    )
-    return blogs
+    versions = get_blog_versions(db, Blog.user_id == user_id)
+    headers = cache_headers(make_etag(user_id, versions), cache_control=PRIVATE_CACHE)
+    if is_not_modified(request, headers["ETag"]):
+        return not_modified(headers)
+
+    rows = get_blog_rows(db, Blog.user_id == user_id)
+    return json_response(serialize_blog_rows(rows), headers)
 
 
 # ✅ Delete blog
@@ -167,4 +241,5 @@ def delete_blog(
 
     db.delete(blog)
     db.commit()
+    feed_store.blog_deleted(blog_id)
     return {"message": "Blog deleted successfully"}
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+from app.core.caching import cache_headers, is_not_modified, not_modified
+from app.core.feeds import Document, feed_store
+from app.db.session import get_db
+
+router = APIRouter()
+
+
+def xml_response(request: Request, document: Document, media_type: str):
+    headers = cache_headers(document.etag, document.last_modified)
+    if is_not_modified(request, document.etag, document.last_modified):
+        return not_modified(headers)
+    return Response(content=document.body, media_type=media_type, headers=headers)
+
+
+# The store only queries on first load or feed refill; read from the primary
+# so a post written during that load is never missed
+@router.get("/sitemap.xml")
+def sitemap_index(request: Request, db: Session = Depends(get_db)):
+    document = feed_store.sitemap(db)
+    return xml_response(request, document, "application/xml")
+
+
+@router.get("/sitemap-{page}.xml")
+def sitemap_page(page: int, request: Request, db: Session = Depends(get_db)):
+    document = feed_store.sitemap(db, page)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Sitemap page not found")
+    return xml_response(request, document, "application/xml")
+
+
+@router.get("/feed.xml")
+def atom_feed(request: Request, db: Session = Depends(get_db)):
+    document = feed_store.feed(db)
+    return xml_response(request, document, "application/atom+xml")
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, Form
 from app.core.security import decode_access_token
 from app.db.models.user import User
-from app.db.session import SessionLocal
+from app.db.session import get_db, get_read_db
 from app.schemas.user import UserRead
 from sqlalchemy.orm import Session
 from typing import Optional
@@ -10,14 +10,6 @@ from app.config.cloudinary import upload_image
 router = APIRouter()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 def get_current_user(request: Request):
     token = request.cookies.get("access_token")
     if not token:
@@ -27,7 +19,7 @@ def get_current_user(request: Request):
 
 
 @router.get("/me", response_model=UserRead)
-def me(db: Session = Depends(get_db), user_id: int = Depends(get_current_user)):
+def me(db: Session = Depends(get_read_db), user_id: int = Depends(get_current_user)):
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -35,7 +27,7 @@ def me(db: Session = Depends(get_db), user_id: int = Depends(get_current_user)):
 
 
 @router.put("/me/update", response_model=UserRead)
-async def update_user_details(
+def update_user_details(
     bio: Optional[str] = Form(None),
     website: Optional[str] = Form(None),
     twitter: Optional[str] = Form(None),
@@ -70,6 +62,8 @@ async def update_user_details(
                 status_code=500, detail=f"Image upload failed: {str(e)}"
             )
 
+    # Incremented in SQL so overlapping updates stay last-write-wins
+    user.version_id = User.version_id + 1
     db.commit()
     db.refresh(user)
     return user
@@ -0,0 +1,228 @@
+import asyncio
+from abc import ABC, abstractmethod
+import ipaddress
+import math
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from app.core.config import settings
+from app.core.security import get_optional_user_id
+
+
+@dataclass(frozen=True)
+class RouteClass:
+    name: str
+    concurrency: int
+    queue_depth: int
+    rate_per_minute: int
+    burst: int
+
+
+ROUTE_CLASSES = {
+    "auth": RouteClass(
+        "auth",
+        settings.AUTH_CONCURRENCY,
+        settings.AUTH_QUEUE_DEPTH,
+        settings.AUTH_RATE_PER_MINUTE,
+        settings.AUTH_BURST,
+    ),
+    "upload": RouteClass(
+        "upload",
+        settings.UPLOAD_CONCURRENCY,
+        settings.UPLOAD_QUEUE_DEPTH,
+        settings.UPLOAD_RATE_PER_MINUTE,
+        settings.UPLOAD_BURST,
+    ),
+}
+
+# (method, path prefix, route class); unlisted routes such as /get are never limited
+LIMITED_ROUTES = [
+    ("POST", "/login", "auth"),
+    ("POST", "/signup", "auth"),
+    ("POST", "/create", "upload"),
+    ("PUT", "/update/", "upload"),
+    ("PUT", "/me/update", "upload"),
+]
+
+
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(network, strict=False) for network in settings.TRUSTED_PROXIES
+]
+METRICS_ALLOWED_NETWORKS = [
+    ipaddress.ip_network(network, strict=False)
+    for network in settings.METRICS_ALLOWED_NETWORKS
+]
+
+
+def in_networks(host: str, networks: list) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in networks)
+
+
+def client_address(request: Request) -> str:
+    # Walk X-Forwarded-For right to left, skipping our own proxies; the first
+    # untrusted hop is the client. Anything further left is client-supplied.
+    host = request.client.host if request.client else "-"
+    if not in_networks(host, TRUSTED_PROXIES):
+        return host
+    forwarded = request.headers.get("x-forwarded-for", "")
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not in_networks(hop, TRUSTED_PROXIES):
+            return hop
+    return hops[0] if hops else host
+
+
+def may_read_metrics(request: Request) -> bool:
+    return in_networks(client_address(request), METRICS_ALLOWED_NETWORKS)
+
+
+def classify(request: Request) -> Optional[RouteClass]:
+    for method, prefix, name in LIMITED_ROUTES:
+        if request.method == method and request.url.path.startswith(prefix):
+            return ROUTE_CLASSES[name]
+    return None
+
+
+class AdmissionBackend(ABC):
+    """Limiter state store; swap in a shared one to limit across processes."""
+
+    @abstractmethod
+    def take_tokens(self, keys: list, rate_per_minute: int, burst: int) -> float:
+        """Take a token from every bucket in `keys`, or from none of them.
+
+        Returns 0 on success, else seconds until all of them have a token.
+        """
+
+    @abstractmethod
+    async def acquire_slot(
+        self, name: str, limit: int, queue_depth: int, timeout: float
+    ) -> bool:
+        """Wait up to `timeout` for one of `limit` slots; False if shed."""
+
+    @abstractmethod
+    def release_slot(self, name: str):
+        """Return a slot taken by acquire_slot."""
+
+
+class InMemoryBackend(AdmissionBackend):
+    MAX_BUCKETS = 10_000
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._waiting = Counter()
+
+    def take_tokens(self, keys: list, rate_per_minute: int, burst: int) -> float:
+        rate = rate_per_minute / 60
+        now = time.monotonic()
+        with self._lock:
+            if len(self._buckets) > self.MAX_BUCKETS:
+                self._prune(now)
+            levels = {}
+            for key in keys:
+                bucket = self._buckets.get(key, (burst, now, rate, burst))
+                tokens, updated, _, _ = bucket
+                levels[key] = min(burst, tokens + (now - updated) * rate)
+            # Check every bucket before debiting any of them
+            wait = max((1 - tokens) / rate for tokens in levels.values())
+            spent = 1 if wait <= 0 else 0
+            for key, tokens in levels.items():
+                self._buckets[key] = (tokens - spent, now, rate, burst)
+            return max(wait, 0.0)
+
+    def _prune(self, now: float):
+        # A bucket that has refilled is indistinguishable from a missing one
+        for key, (tokens, updated, rate, burst) in list(self._buckets.items()):
+            if tokens + (now - updated) * rate >= burst:
+                del self._buckets[key]
+
+    async def acquire_slot(
+        self, name: str, limit: int, queue_depth: int, timeout: float
+    ) -> bool:
+        slot = self._slots.setdefault(name, asyncio.Semaphore(limit))
+        if slot.locked() and self._waiting[name] >= queue_depth:
+            return False
+        self._waiting[name] += 1
+        try:
+            await asyncio.wait_for(slot.acquire(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiting[name] -= 1
+
+    def release_slot(self, name: str):
+        self._slots[name].release()
+
+
+class AdmissionController:
+    def __init__(self, backend: AdmissionBackend):
+        self.backend = backend
+        self.admitted = Counter()
+        self.rejected = Counter()
+
+    def metrics(self) -> dict:
+        return {
+            name: {
+                "admitted": self.admitted[name],
+                "rate_limited": self.rejected[(name, "rate_limited")],
+                "shed": self.rejected[(name, "shed")],
+            }
+            for name in ROUTE_CLASSES
+        }
+
+    def _reject(
+        self, route_class: RouteClass, reason: str, status_code: int, retry_after: float
+    ):
+        self.rejected[(route_class.name, reason)] += 1
+        if status_code == 429:
+            detail = "Too many requests"
+        else:
+            detail = "Server busy, try again"
+        return JSONResponse(
+            status_code=status_code,
+            content={"detail": detail},
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    async def dispatch(self, request: Request, call_next):
+        route_class = classify(request)
+        if route_class is None:
+            return await call_next(request)
+
+        keys = [f"{route_class.name}:client:{client_address(request)}"]
+        user_id = get_optional_user_id(request)
+        if user_id is not None:
+            keys.append(f"{route_class.name}:user:{user_id}")
+        wait = self.backend.take_tokens(
+            keys, route_class.rate_per_minute, route_class.burst
+        )
+        if wait:
+            return self._reject(route_class, "rate_limited", 429, wait)
+
+        admitted = await self.backend.acquire_slot(
+            route_class.name,
+            route_class.concurrency,
+            route_class.queue_depth,
+            settings.ADMISSION_QUEUE_TIMEOUT,
+        )
+        if not admitted:
+            return self._reject(route_class, "shed", 503, 1)
+
+        self.admitted[route_class.name] += 1
+        try:
+            return await call_next(request)
+        finally:
+            self.backend.release_slot(route_class.name)
+
+
+controller = AdmissionController(InMemoryBackend())
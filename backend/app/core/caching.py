@@ -0,0 +1,75 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import sha1
+from typing import Optional
+from fastapi import Request, Response
+from app.core.config import settings
+
+PUBLIC_CACHE = f"public, max-age=0, s-maxage={settings.CACHE_S_MAXAGE}"
+PRIVATE_CACHE = "private, no-cache"
+
+
+def as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _opaque(tag: str) -> str:
+    return tag.strip().removeprefix("W/")
+
+
+def make_etag(*parts) -> str:
+    return f'W/"{sha1(repr(parts).encode()).hexdigest()}"'
+
+
+def latest(*timestamps: Optional[datetime]) -> Optional[datetime]:
+    present = [as_utc(ts) for ts in timestamps if ts is not None]
+    return max(present) if present else None
+
+
+def read_cache_control(request: Request) -> str:
+    # Signed-in readers bypass the CDN so an author never gets a copy cached
+    # before their own edit; recent writers were also routed to the primary
+    if "access_token" in request.cookies or getattr(
+        request.state, "read_your_writes", False
+    ):
+        return PRIVATE_CACHE
+    return PUBLIC_CACHE
+
+
+def cache_headers(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = PUBLIC_CACHE,
+) -> dict:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(as_utc(last_modified), usegmt=True)
+    # Public copies too: a shared cache must not answer a signed-in request
+    # with the anonymous response
+    headers["Vary"] = "Cookie"
+    return headers
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime] = None
+) -> bool:
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [_opaque(tag) for tag in if_none_match.split(",")]
+        return "*" in tags or _opaque(etag) in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = as_utc(parsedate_to_datetime(if_modified_since))
+    except (TypeError, ValueError):
+        return False
+    return as_utc(last_modified).replace(microsecond=0) <= since
+
+
+def not_modified(headers: dict) -> Response:
+    return Response(status_code=304, headers=headers)
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -13,11 +14,34 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 180
 
     DATABASE_URL: str
+    DATABASE_REPLICA_URL: Optional[str] = None
+    READ_YOUR_WRITES_SECONDS: int = 10
 
     CLOUDINARY_CLOUD_NAME: str
     CLOUDINARY_API_KEY: str
     CLOUDINARY_API_SECRET: str
 
+    CACHE_S_MAXAGE: int = 30
+
+    SITE_URL: str = "https://thinkkme.vercel.app"
+    # Public base URL of this API, used in sitemap index and feed self links
+    API_URL: str
+    SITE_NAME: str = "Modern Blog"
+
+    ADMISSION_QUEUE_TIMEOUT: float = 2.0
+    # Proxy/CDN addresses or CIDRs whose X-Forwarded-For is believed
+    TRUSTED_PROXIES: List[str] = []
+    # Client networks allowed to read /metrics/admission
+    METRICS_ALLOWED_NETWORKS: List[str] = ["127.0.0.1/32", "::1/128"]
+    AUTH_CONCURRENCY: int = 4
+    AUTH_QUEUE_DEPTH: int = 16
+    AUTH_RATE_PER_MINUTE: int = 10
+    AUTH_BURST: int = 5
+    UPLOAD_CONCURRENCY: int = 8
+    UPLOAD_QUEUE_DEPTH: int = 16
+    UPLOAD_RATE_PER_MINUTE: int = 20
+    UPLOAD_BURST: int = 5
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,314 @@
+import bisect
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+from xml.sax.saxutils import escape, quoteattr
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.caching import as_utc, latest, make_etag
+from app.core.config import settings
+from app.db.models.blog import Blog
+from app.db.models.user import User
+
+# sitemaps.org caps a sitemap file at 50,000 URLs (and 50MB, which pages of
+# <url> entries this size never approach)
+SITEMAP_PAGE_SIZE = 50_000
+FEED_SIZE = 50
+# Other processes and out-of-band SQL also change blogs: compare a cheap
+# signature with the database at most this often, and reload in full
+# after RELOAD_SECONDS regardless (catches edits that skip version_id)
+FRESHNESS_SECONDS = 5
+RELOAD_SECONDS = 600
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+ATOM_NS = "http://www.w3.org/2005/Atom"
+# Anything outside the XML 1.0 Char production makes the whole document
+# malformed, and escape() passes it through
+XML_INVALID_CHARS = re.compile(
+    "[^\x09\x0a\x0d\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]"
+)
+
+
+@dataclass
+class Document:
+    body: bytes
+    etag: str
+    last_modified: datetime
+
+
+def w3c_datetime(value: datetime) -> str:
+    return as_utc(value).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def xml_text(value: str) -> str:
+    return escape(XML_INVALID_CHARS.sub("", value))
+
+
+def blog_url(blog_id: int) -> str:
+    return f"{settings.SITE_URL}/blogs/{blog_id}"
+
+
+def api_url(path: str) -> str:
+    return f"{settings.API_URL.rstrip('/')}{path}"
+
+
+def sitemap_url(blog_id: int, lastmod: datetime) -> str:
+    return (
+        f"<url><loc>{blog_url(blog_id)}</loc>"
+        f"<lastmod>{w3c_datetime(lastmod)}</lastmod></url>"
+    )
+
+
+def feed_entry(
+    blog_id: int,
+    title: str,
+    excerpt: str,
+    author: str,
+    created_at: datetime,
+    updated_at: Optional[datetime],
+) -> str:
+    return (
+        f"<entry><title>{xml_text(title)}</title>"
+        f"<id>{blog_url(blog_id)}</id>"
+        f"<link href={quoteattr(blog_url(blog_id))}/>"
+        f"<published>{w3c_datetime(created_at)}</published>"
+        f"<updated>{w3c_datetime(updated_at or created_at)}</updated>"
+        f"<author><name>{xml_text(author)}</name></author>"
+        f"<summary>{xml_text(excerpt)}</summary></entry>"
+    )
+
+
+def render(body: str) -> Document:
+    encoded = (XML_DECLARATION + body).encode()
+    return Document(encoded, make_etag(encoded), datetime.now(timezone.utc))
+
+
+class FeedStore:
+    """Precomputed sitemap and Atom feed, patched by the blog write handlers.
+
+    Per-post XML fragments live here between requests. A write replaces the
+    fragments it touched and drops only the documents containing them; those
+    are re-joined on their next read. Loaded lazily on first read, per process,
+    and reloaded when the database no longer matches what this process holds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self._ids = []  # sorted; a post's position decides its sitemap page
+        self._urls = {}  # blog id -> <url> fragment
+        self._versions = {}  # blog id -> version_id
+        # blog id -> ((created_at, id), updated, <entry>), newest posts only
+        self._entries = {}
+        self._feed_short = False  # a feed post was deleted; refill on next read
+        self._documents = {}  # "feed", "sitemap", "sitemap-<n>" -> Document
+        self._rendered = {}  # last Document per name, kept across invalidation
+
+    def _load(self, db: Session):
+        rows = (
+            db.query(Blog.id, Blog.version_id, Blog.created_at, Blog.updated_at)
+            .order_by(Blog.id)
+            .all()
+        )
+        self._ids = [row.id for row in rows]
+        self._urls = {
+            row.id: sitemap_url(row.id, row.updated_at or row.created_at)
+            for row in rows
+        }
+        self._versions = {row.id: row.version_id for row in rows}
+        self._load_feed(db)
+        self._documents.clear()
+        self._loaded = True
+        self._loaded_at = self._checked_at = time.monotonic()
+
+    def _signature(self) -> tuple:
+        return (
+            len(self._versions),
+            sum(self._versions),
+            sum(self._versions.values()),
+        )
+
+    def _ensure_fresh(self, db: Session):
+        now = time.monotonic()
+        if not self._loaded or now - self._loaded_at >= RELOAD_SECONDS:
+            self._load(db)
+            return
+        if now - self._checked_at < FRESHNESS_SECONDS:
+            return
+        self._checked_at = now
+        current = db.query(
+            func.count(Blog.id),
+            func.coalesce(func.sum(Blog.id), 0),
+            func.coalesce(func.sum(Blog.version_id), 0),
+        ).one()
+        if tuple(current) != self._signature():
+            self._load(db)
+
+    def _put(self, name: str, body: str) -> Document:
+        document = render(body)
+        previous = self._rendered.get(name)
+        if previous is not None and previous.etag == document.etag:
+            # Unchanged after a reload: keep Last-Modified where it was
+            document = previous
+        self._documents[name] = self._rendered[name] = document
+        return document
+
+    def _load_feed(self, db: Session):
+        rows = (
+            db.query(
+                Blog.id,
+                Blog.title,
+                Blog.excerpt,
+                Blog.created_at,
+                Blog.updated_at,
+                User.name,
+            )
+            .join(Blog.user)
+            .order_by(Blog.created_at.desc(), Blog.id.desc())
+            .limit(FEED_SIZE)
+            .all()
+        )
+        self._entries = {
+            row.id: (
+                (as_utc(row.created_at), row.id),
+                row.updated_at or row.created_at,
+                feed_entry(
+                    row.id,
+                    row.title,
+                    row.excerpt,
+                    row.name,
+                    row.created_at,
+                    row.updated_at,
+                ),
+            )
+            for row in rows
+        }
+        self._feed_short = False
+        self._documents.pop("feed", None)
+
+    def _page_count(self) -> int:
+        return max(1, math.ceil(len(self._ids) / SITEMAP_PAGE_SIZE))
+
+    def _drop_pages_from(self, position: int):
+        self._documents.pop("sitemap", None)
+        for page in range(position // SITEMAP_PAGE_SIZE + 1, self._page_count() + 2):
+            self._documents.pop(f"sitemap-{page}", None)
+
+    def blog_saved(self, blog: Blog):
+        # Built before taking the lock: `blog.user` may lazy-load
+        url = sitemap_url(blog.id, blog.updated_at or blog.created_at)
+        key = (as_utc(blog.created_at), blog.id)
+        entry = (
+            key,
+            blog.updated_at or blog.created_at,
+            feed_entry(
+                blog.id,
+                blog.title,
+                blog.excerpt,
+                blog.user.name,
+                blog.created_at,
+                blog.updated_at,
+            ),
+        )
+        with self._lock:
+            if not self._loaded:
+                return
+            position = bisect.bisect_left(self._ids, blog.id)
+            if blog.id not in self._urls:
+                self._ids.insert(position, blog.id)
+                self._drop_pages_from(position)
+            else:
+                self._documents.pop("sitemap", None)
+                page = position // SITEMAP_PAGE_SIZE + 1
+                self._documents.pop(f"sitemap-{page}", None)
+            self._urls[blog.id] = url
+            self._versions[blog.id] = blog.version_id
+
+            oldest = min(self._entries.values(), default=None)
+            if (
+                blog.id in self._entries
+                or len(self._entries) < FEED_SIZE
+                or key > oldest[0]
+            ):
+                self._entries[blog.id] = entry
+                if len(self._entries) > FEED_SIZE:
+                    del self._entries[oldest[0][1]]
+                self._documents.pop("feed", None)
+
+    def blog_deleted(self, blog_id: int):
+        with self._lock:
+            if not self._loaded or blog_id not in self._urls:
+                return
+            position = bisect.bisect_left(self._ids, blog_id)
+            self._drop_pages_from(position)
+            del self._ids[position]
+            del self._urls[blog_id]
+            del self._versions[blog_id]
+            if self._entries.pop(blog_id, None):
+                self._feed_short = True
+                self._documents.pop("feed", None)
+
+    def _sitemap_page(self, page: int) -> Document:
+        name = f"sitemap-{page}"
+        if name not in self._documents:
+            start = (page - 1) * SITEMAP_PAGE_SIZE
+            urls = "".join(
+                self._urls[blog_id]
+                for blog_id in self._ids[start : start + SITEMAP_PAGE_SIZE]
+            )
+            self._put(name, f'<urlset xmlns="{SITEMAP_NS}">{urls}</urlset>')
+        return self._documents[name]
+
+    def sitemap(self, db: Session, page: Optional[int] = None) -> Optional[Document]:
+        """`/sitemap.xml` when `page` is None, else page `page` of the split."""
+        with self._lock:
+            self._ensure_fresh(db)
+            pages = self._page_count()
+            if page is not None:
+                return self._sitemap_page(page) if 1 <= page <= pages else None
+            if pages == 1:
+                return self._sitemap_page(1)
+            if "sitemap" not in self._documents:
+                sitemaps = "".join(
+                    f"<sitemap><loc>{escape(api_url(f'/sitemap-{n}.xml'))}</loc>"
+                    f"<lastmod>{w3c_datetime(self._sitemap_page(n).last_modified)}"
+                    "</lastmod></sitemap>"
+                    for n in range(1, pages + 1)
+                )
+                self._put(
+                    "sitemap",
+                    f'<sitemapindex xmlns="{SITEMAP_NS}">{sitemaps}</sitemapindex>',
+                )
+            return self._documents["sitemap"]
+
+    def feed(self, db: Session) -> Document:
+        with self._lock:
+            self._ensure_fresh(db)
+            if self._feed_short:
+                self._load_feed(db)
+            if "feed" not in self._documents:
+                newest = sorted(self._entries.values(), reverse=True)
+                updated = latest(*(updated for _, updated, _ in newest))
+                self._put(
+                    "feed",
+                    f'<feed xmlns="{ATOM_NS}">'
+                    f"<title>{xml_text(settings.SITE_NAME)}</title>"
+                    f"<id>{settings.SITE_URL}/</id>"
+                    f"<link href={quoteattr(settings.SITE_URL + '/blogs')}/>"
+                    f'<link rel="self" href={quoteattr(api_url("/feed.xml"))}/>'
+                    f"<updated>{w3c_datetime(updated or datetime.now(timezone.utc))}"
+                    "</updated>"
+                    + "".join(entry for _, _, entry in newest)
+                    + "</feed>",
+                )
+            return self._documents["feed"]
+
+
+feed_store = FeedStore()
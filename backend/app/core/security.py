@@ -1,6 +1,8 @@
+from fastapi import Request
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from jose import jwt
+from jose import JWTError, jwt
+from typing import Optional
 from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -26,3 +28,13 @@ def decode_access_token(token: str):
     return jwt.decode(
         token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
     )
+
+
+def get_optional_user_id(request: Request) -> Optional[int]:
+    token = request.cookies.get("access_token")
+    if not token:
+        return None
+    try:
+        return int(decode_access_token(token)["sub"])
+    except (JWTError, KeyError, ValueError):
+        return None
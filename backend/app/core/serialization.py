@@ -0,0 +1,44 @@
+import orjson
+from fastapi import Response
+from app.schemas.blog import BlogRead
+from app.schemas.user import UserRead
+
+# Column names in schema order; rows are selected under these labels
+BLOG_FIELDS = [name for name in BlogRead.model_fields if name != "user"]
+USER_FIELDS = list(UserRead.model_fields)
+
+
+def user_label(field: str) -> str:
+    return f"user__{field}"
+
+
+def dumps(payload) -> bytes:
+    # OPT_UTC_Z renders UTC offsets as "Z", matching pydantic's datetime output
+    return orjson.dumps(payload, option=orjson.OPT_UTC_Z)
+
+
+def serialize_blog_rows(rows) -> list:
+    authors = {}
+    payload = []
+    for row in rows:
+        values = row._mapping
+        user_id = values["user_id"]
+        if user_id not in authors:
+            # Validated once per author per page, so EmailStr output is unchanged
+            user = UserRead.model_validate(
+                {field: values[user_label(field)] for field in USER_FIELDS}
+            )
+            authors[user_id] = orjson.Fragment(dumps(user.model_dump(mode="json")))
+        payload.append(
+            {
+                name: authors[user_id] if name == "user" else values[name]
+                for name in BlogRead.model_fields
+            }
+        )
+    return payload
+
+
+def json_response(payload, headers: dict) -> Response:
+    return Response(
+        content=dumps(payload), media_type="application/json", headers=headers
+    )
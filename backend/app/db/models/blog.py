@@ -16,5 +16,6 @@ class Blog(Base):
     image = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version_id = Column(Integer, nullable=False, server_default="1")
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     user = relationship("User", backref="blogs")
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
 from app.db.base import Base
 
 
@@ -15,3 +16,5 @@ class User(Base):
     github = Column(String, nullable=True)
     linkedin = Column(String, nullable=True)
     profile_image = Column(String, nullable=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version_id = Column(Integer, nullable=False, server_default="1")
@@ -1,6 +1,68 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from fastapi import Request
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.security import get_optional_user_id
 
 engine = create_engine(settings.DATABASE_URL)
+replica_engine = (
+    create_engine(settings.DATABASE_REPLICA_URL)
+    if settings.DATABASE_REPLICA_URL
+    else engine
+)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+ReplicaSessionLocal = sessionmaker(
+    bind=replica_engine, autocommit=False, autoflush=False
+)
+
+# user_id -> monotonic deadline until which that user's reads go to the primary
+_recent_writers: dict = {}
+_recent_writers_lock = threading.Lock()
+
+
+def mark_recent_write(user_id: int):
+    now = time.monotonic()
+    with _recent_writers_lock:
+        for expired in [uid for uid, until in _recent_writers.items() if until <= now]:
+            del _recent_writers[expired]
+        _recent_writers[user_id] = now + settings.READ_YOUR_WRITES_SECONDS
+
+
+def wrote_recently(user_id: int) -> bool:
+    with _recent_writers_lock:
+        until = _recent_writers.get(user_id)
+    return until is not None and until > time.monotonic()
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _stick_writer_to_primary(session):
+    user_id = session.info.get("user_id")
+    if user_id is not None:
+        mark_recent_write(user_id)
+
+
+# Dependency for handlers that write; always the primary
+def get_db(request: Request):
+    db = SessionLocal()
+    db.info["user_id"] = get_optional_user_id(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Dependency for GET handlers; the replica unless the caller just wrote
+def get_read_db(request: Request):
+    user_id = get_optional_user_id(request)
+    # Read by read_cache_control: shared caches must not store this response
+    request.state.read_your_writes = user_id is not None and wrote_recently(user_id)
+    if request.state.read_your_writes:
+        db = SessionLocal()
+    else:
+        db = ReplicaSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -2,13 +2,20 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.database import engine
 from app.db import base
-from app.api import auth, blog, user
+from app.api import auth, blog, feeds, user
+from app.core import admission
 
 base.Base.metadata.create_all(bind=engine)
 
 app = FastAPI()
 
 
+# Registered before CORS so 429/503 rejections still carry CORS headers
+@app.middleware("http")
+async def admission_control_middleware(request, call_next):
+    return await admission.controller.dispatch(request, call_next)
+
+
 # CORS (Allow Next.js frontend to communicate with FastAPI backend)
 origins = ["http://localhost:3000", "https://thinkkme.vercel.app/"]  # local Next.js
 
@@ -20,7 +27,7 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-from fastapi import Request
+from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
 import traceback
 
@@ -38,8 +45,17 @@ async def log_exceptions_middleware(request: Request, call_next):
 app.include_router(auth.router)
 app.include_router(blog.router)
 app.include_router(user.router)
+app.include_router(feeds.router)
 
 
 @app.get("/")
 def root():
     return {"message": "Blog API is running"}
+
+
+# Internal only: answers 404 outside METRICS_ALLOWED_NETWORKS
+@app.get("/metrics/admission", include_in_schema=False)
+def admission_metrics(request: Request):
+    if not admission.may_read_metrics(request):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return admission.controller.metrics()